@@ -4,6 +4,33 @@
 -- Enable UUID extension for PostgreSQL
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 
+-- Time-ordered UUIDv7 (unix-ms timestamp overlaid on a random v4, version nibble set to 7)
+-- Used for audit_logs so its high-volume inserts append to the right edge of the PK index
+CREATE OR REPLACE FUNCTION uuid_generate_v7()
+RETURNS uuid AS $$
+BEGIN
+    RETURN encode(
+        set_bit(
+            set_bit(
+                overlay(
+                    uuid_send(gen_random_uuid())
+                    PLACING substring(int8send(floor(extract(epoch FROM clock_timestamp()) * 1000)::bigint) FROM 3)
+                    FROM 1 FOR 6
+                ),
+                52, 1
+            ),
+            53, 1
+        ),
+        'hex'
+    )::uuid;
+END;
+$$ language 'plpgsql' VOLATILE;
+
+-- Enumerated types
+CREATE TYPE user_role AS ENUM ('Admin', 'Specialist', 'Patient', 'FamilyMember');
+CREATE TYPE appointment_status AS ENUM ('Pending', 'Confirmed', 'Canceled', 'Completed', 'NoShow');
+CREATE TYPE audit_action AS ENUM ('INSERT', 'UPDATE', 'DELETE');
+
 -- =====================================================
 -- CORE TABLES
 -- =====================================================
@@ -15,7 +42,7 @@ CREATE TABLE users (
     last_name VARCHAR(100) NOT NULL,
     email VARCHAR(255) UNIQUE NOT NULL,
     password_hash VARCHAR(255) NOT NULL,
-    role VARCHAR(20) NOT NULL CHECK (role IN ('Admin', 'Specialist', 'Patient', 'FamilyMember')),
+    role user_role NOT NULL,
     registration_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     is_active BOOLEAN DEFAULT TRUE,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -80,7 +107,7 @@ CREATE TABLE appointments (
     patient_id UUID NOT NULL REFERENCES patients(patient_id) ON DELETE CASCADE,
     start_datetime TIMESTAMP NOT NULL,
     end_datetime TIMESTAMP NOT NULL,
-    status VARCHAR(20) NOT NULL DEFAULT 'Pending' CHECK (status IN ('Pending', 'Confirmed', 'Canceled', 'Completed', 'NoShow')),
+    status appointment_status NOT NULL DEFAULT 'Pending',
     appointment_type VARCHAR(50) NOT NULL,
     internal_notes TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -94,7 +121,7 @@ CREATE TABLE appointments (
 CREATE TABLE availability_blocks (
     availability_block_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     specialist_id UUID NOT NULL REFERENCES specialists(specialist_id) ON DELETE CASCADE,
-    day_of_week INTEGER NOT NULL CHECK (day_of_week BETWEEN 1 AND 7), -- 1=Monday, 7=Sunday
+    day_of_week SMALLINT NOT NULL CHECK (day_of_week BETWEEN 1 AND 7), -- 1=Monday, 7=Sunday
     start_time TIME NOT NULL,
     end_time TIME NOT NULL,
     is_active BOOLEAN DEFAULT TRUE,
@@ -123,7 +150,8 @@ CREATE TABLE medical_records (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     created_by UUID,
-    updated_by UUID
+    updated_by UUID,
+    CONSTRAINT mr_files_is_array CHECK (jsonb_typeof(attached_files_json) = 'array')
 );
 
 -- Templates table - Reusable medical document templates
@@ -181,21 +209,37 @@ CREATE TABLE notifications (
     message TEXT NOT NULL,
     notification_type VARCHAR(50) NOT NULL, -- e.g., Appointment, Material, System
     is_read BOOLEAN DEFAULT FALSE,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     read_at TIMESTAMP
 );
 
 -- Audit Log table - Track changes to sensitive data
+-- Partitioned by month on timestamp; the partition key must be part of the primary key
 CREATE TABLE audit_logs (
-    log_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    log_id UUID NOT NULL DEFAULT uuid_generate_v7(),
     table_name VARCHAR(100) NOT NULL,
     record_id UUID NOT NULL,
-    action VARCHAR(20) NOT NULL, -- INSERT, UPDATE, DELETE
+    action audit_action NOT NULL,
     old_values JSONB,
     new_values JSONB,
-    user_id UUID REFERENCES users(user_id),
-    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
+    -- Not a foreign key: the log outlives the user, including the DELETE row
+    -- audit_trigger() writes when a user deletes their own account
+    user_id UUID,
+    timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (log_id, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+-- Catch-all partition; monthly partitions are pre-created by a scheduled job, e.g.
+-- CREATE TABLE audit_logs_2025_01 PARTITION OF audit_logs FOR VALUES FROM ('2025-01-01') TO ('2025-02-01');
+-- Expired months are removed with DROP TABLE audit_logs_YYYY_MM.
+-- A month whose rows already landed in audit_logs_default can't be created directly;
+-- move them out first (create_audit_log_partition() does this), in one transaction:
+--   ALTER TABLE audit_logs DETACH PARTITION audit_logs_default;
+--   CREATE TABLE audit_logs_2025_01 PARTITION OF audit_logs FOR VALUES FROM ('2025-01-01') TO ('2025-02-01');
+--   WITH moved AS (DELETE FROM audit_logs_default WHERE timestamp >= '2025-01-01' AND timestamp < '2025-02-01' RETURNING *)
+--       INSERT INTO audit_logs_2025_01 SELECT * FROM moved;
+--   ALTER TABLE audit_logs ATTACH PARTITION audit_logs_default DEFAULT;
+CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT;
 
 -- =====================================================
 -- INDEXES FOR PERFORMANCE
@@ -224,6 +268,7 @@ CREATE INDEX idx_appointments_patient_id ON appointments(patient_id);
 CREATE INDEX idx_appointments_start_datetime ON appointments(start_datetime);
 CREATE INDEX idx_appointments_status ON appointments(status);
 CREATE INDEX idx_appointments_date_range ON appointments(start_datetime, end_datetime);
+CREATE INDEX idx_appointments_specialist_time ON appointments(specialist_id, start_datetime) INCLUDE (status, patient_id);
 
 -- Availability Blocks indexes
 CREATE INDEX idx_availability_blocks_specialist_id ON availability_blocks(specialist_id);
@@ -234,6 +279,8 @@ CREATE INDEX idx_availability_blocks_exception_date ON availability_blocks(excep
 CREATE INDEX idx_medical_records_patient_id ON medical_records(patient_id);
 CREATE INDEX idx_medical_records_specialist_id ON medical_records(specialist_id);
 CREATE INDEX idx_medical_records_date ON medical_records(record_date);
+CREATE INDEX idx_medical_records_patient_date ON medical_records(patient_id, record_date) INCLUDE (specialist_id);
+CREATE INDEX idx_medical_records_files_gin ON medical_records USING gin (attached_files_json jsonb_path_ops);
 
 -- Templates indexes
 CREATE INDEX idx_templates_specialist_id ON templates(specialist_id);
@@ -254,11 +301,45 @@ CREATE INDEX idx_patient_material_assignments_date ON patient_material_assignmen
 CREATE INDEX idx_notifications_user_id ON notifications(user_id);
 CREATE INDEX idx_notifications_read ON notifications(is_read);
 CREATE INDEX idx_notifications_created_at ON notifications(created_at);
+CREATE INDEX idx_notifications_user_unread ON notifications(user_id) WHERE is_read = false;
+CREATE INDEX idx_notifications_user_created ON notifications(user_id, created_at, notification_id);
 
 -- Audit Log indexes
-CREATE INDEX idx_audit_logs_table_record ON audit_logs(table_name, record_id);
+CREATE INDEX idx_audit_logs_table_record ON audit_logs(table_name, record_id, timestamp);
 CREATE INDEX idx_audit_logs_user_id ON audit_logs(user_id);
 CREATE INDEX idx_audit_logs_timestamp ON audit_logs(timestamp);
+CREATE INDEX idx_audit_logs_old_values_gin ON audit_logs USING gin (old_values jsonb_path_ops);
+CREATE INDEX idx_audit_logs_new_values_gin ON audit_logs USING gin (new_values jsonb_path_ops);
+CREATE INDEX idx_audit_logs_user_email ON audit_logs((old_values ->> 'email')) WHERE table_name = 'users';
+
+-- =====================================================
+-- MATERIALIZED VIEWS
+-- =====================================================
+
+-- Upcoming appointments with specialist details - dashboard query
+-- Refresh with: REFRESH MATERIALIZED VIEW CONCURRENTLY mv_upcoming_appointments;
+CREATE MATERIALIZED VIEW mv_upcoming_appointments AS
+SELECT a.appointment_id, a.specialist_id, a.patient_id, a.start_datetime, a.end_datetime,
+       a.status, a.appointment_type, s.specialty,
+       u.first_name AS specialist_first_name, u.last_name AS specialist_last_name
+FROM appointments a
+JOIN specialists s ON a.specialist_id = s.specialist_id
+JOIN users u ON s.user_id = u.user_id
+WHERE a.status IN ('Pending', 'Confirmed')
+WITH DATA;
+
+CREATE UNIQUE INDEX idx_mv_upcoming_appointments_id ON mv_upcoming_appointments(appointment_id);
+CREATE INDEX idx_mv_upcoming_appointments_specialist_start ON mv_upcoming_appointments(specialist_id, start_datetime);
+
+-- Most recent medical record per patient - patient listings
+-- Refresh with: REFRESH MATERIALIZED VIEW CONCURRENTLY mv_latest_medical_record;
+CREATE MATERIALIZED VIEW mv_latest_medical_record AS
+SELECT DISTINCT ON (patient_id) patient_id, record_id, specialist_id, record_date, diagnosis
+FROM medical_records
+ORDER BY patient_id, record_date DESC, record_id DESC
+WITH DATA;
+
+CREATE UNIQUE INDEX idx_mv_latest_medical_record_patient_id ON mv_latest_medical_record(patient_id);
 
 -- =====================================================
 -- TRIGGERS FOR AUDIT LOGGING
@@ -285,6 +366,33 @@ CREATE TRIGGER update_templates_updated_at BEFORE UPDATE ON templates FOR EACH R
 CREATE TRIGGER update_educational_materials_updated_at BEFORE UPDATE ON educational_materials FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 CREATE TRIGGER update_patient_material_assignments_updated_at BEFORE UPDATE ON patient_material_assignments FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+-- Function to copy row changes into audit_logs (TG_ARGV[0] = primary key column)
+-- The acting user is read from the transaction-local app.user_id setting:
+--   SELECT set_config('app.user_id', '<user uuid>', true);
+CREATE OR REPLACE FUNCTION audit_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO audit_logs (table_name, record_id, action, old_values, new_values, user_id, timestamp)
+    VALUES (
+        TG_TABLE_NAME,
+        (COALESCE(to_jsonb(NEW), to_jsonb(OLD)) ->> TG_ARGV[0])::uuid,
+        TG_OP::audit_action,
+        to_jsonb(OLD) - 'password_hash',
+        to_jsonb(NEW) - 'password_hash',
+        NULLIF(current_setting('app.user_id', true), '')::uuid,
+        CURRENT_TIMESTAMP
+    );
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- Apply audit trigger to tables holding sensitive data
+CREATE TRIGGER audit_users AFTER INSERT OR UPDATE OR DELETE ON users FOR EACH ROW EXECUTE FUNCTION audit_trigger('user_id');
+CREATE TRIGGER audit_patients AFTER INSERT OR UPDATE OR DELETE ON patients FOR EACH ROW EXECUTE FUNCTION audit_trigger('patient_id');
+CREATE TRIGGER audit_family_members AFTER INSERT OR UPDATE OR DELETE ON family_members FOR EACH ROW EXECUTE FUNCTION audit_trigger('family_member_id');
+CREATE TRIGGER audit_appointments AFTER INSERT OR UPDATE OR DELETE ON appointments FOR EACH ROW EXECUTE FUNCTION audit_trigger('appointment_id');
+CREATE TRIGGER audit_medical_records AFTER INSERT OR UPDATE OR DELETE ON medical_records FOR EACH ROW EXECUTE FUNCTION audit_trigger('record_id');
+
 -- =====================================================
 -- SAMPLE DATA (Optional - for development/testing)
 -- =====================================================
@@ -3,29 +3,121 @@ SyEI - Holistic Medical Center SQLAlchemy Models
 Python SQLAlchemy models for the medical center backoffice system
 """
 
-from datetime import datetime, date, time
+from datetime import date, time
 from typing import Optional, List
 from sqlalchemy import (
-    Column, String, DateTime, Boolean, Text, Integer, 
-    ForeignKey, UniqueConstraint, CheckConstraint, JSON
+    Column, String, DateTime, Date, Time, Boolean, Text, SmallInteger, Enum as SAEnum,
+    ForeignKey, UniqueConstraint, CheckConstraint, Index, MetaData, Table, insert, create_engine, text,
+    select, lambda_stmt, tuple_, event, false
 )
+from sqlalchemy.engine import make_url
+from sqlalchemy.sql.lambdas import StatementLambdaElement
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship, Mapped
+from sqlalchemy.orm import declared_attr, lazyload, raiseload, relationship, Mapped
 from sqlalchemy.sql import func
+from collections import deque
+from contextlib import contextmanager
+from enum import Enum
+from time import time_ns
+import os
 import uuid
 
 Base = declarative_base()
 
+# Random tails for generate_uuid(), drawn from os.urandom() in batches so bulk
+# inserts don't pay one syscall per row
+_UUID_POOL_SIZE = 4096
+_uuid_random_pool = deque()
+
+# A forked worker (gunicorn --preload, Celery prefork) must not reuse the
+# parent's remaining tails, or two workers could generate identical ids
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_uuid_random_pool.clear)
+
+def _refill_uuid_random_pool():
+    """Refill the pool with 74-bit random integers from a single os.urandom() call"""
+    buf = os.urandom(10 * _UUID_POOL_SIZE)
+    _uuid_random_pool.extend(
+        int.from_bytes(buf[i:i + 10], 'big') >> 6
+        for i in range(0, len(buf), 10)
+    )
+
 def generate_uuid():
-    """Generate a UUID for primary keys"""
-    return str(uuid.uuid4())
+    """Generate a time-ordered UUIDv7 for primary keys (native uuid.UUID, stored as 16-byte uuid)
+
+    The 48-bit millisecond timestamp prefix keeps inserts appending to the right
+    edge of the primary key B-tree instead of splitting random leaf pages.
+    """
+    try:
+        rand = _uuid_random_pool.popleft()
+    except IndexError:
+        _refill_uuid_random_pool()
+        rand = _uuid_random_pool.popleft()
+    unix_ts_ms = time_ns() // 1_000_000
+    rand_a = rand >> 62
+    rand_b = rand & ((1 << 62) - 1)
+    return uuid.UUID(int=(unix_ts_ms << 80) | (0x7 << 76) | (rand_a << 64) | (0b10 << 62) | rand_b)
+
+# =====================================================
+# ENUMS (Python Enums for type safety)
+# =====================================================
+
+class UserRole(str, Enum):
+    ADMIN = "Admin"
+    SPECIALIST = "Specialist"
+    PATIENT = "Patient"
+    FAMILY_MEMBER = "FamilyMember"
+
+class AppointmentStatus(str, Enum):
+    PENDING = "Pending"
+    CONFIRMED = "Confirmed"
+    CANCELED = "Canceled"
+    COMPLETED = "Completed"
+    NO_SHOW = "NoShow"
+
+class AuditAction(str, Enum):
+    INSERT = "INSERT"
+    UPDATE = "UPDATE"
+    DELETE = "DELETE"
+
+def _enum_values(enum_class):
+    """Persist enum values (e.g. 'Admin') rather than member names as native enum labels"""
+    return [member.value for member in enum_class]
+
+# =====================================================
+# MIXINS
+# =====================================================
+
+class AuditMixin:
+    """Audit columns shared by every editable model - who created/updated a row and when"""
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    
+    @declared_attr
+    def created_by(cls):
+        return Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=True)
+    
+    @declared_attr
+    def updated_by(cls):
+        return Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=True)
+    
+    # users references itself, so its remote side has to be named explicitly
+    @declared_attr
+    def created_user(cls):
+        remote_side = "User.id" if cls.__tablename__ == 'users' else None
+        return relationship("User", foreign_keys=[cls.created_by], remote_side=remote_side)
+    
+    @declared_attr
+    def updated_user(cls):
+        remote_side = "User.id" if cls.__tablename__ == 'users' else None
+        return relationship("User", foreign_keys=[cls.updated_by], remote_side=remote_side)
 
 # =====================================================
 # CORE MODELS
 # =====================================================
 
-class User(Base):
+class User(AuditMixin, Base):
     """User model - Base user accounts with role-based access"""
     __tablename__ = 'users'
     
@@ -34,37 +126,26 @@ class User(Base):
     last_name = Column(String(100), nullable=False)
     email = Column(String(255), unique=True, nullable=False)
     password_hash = Column(String(255), nullable=False)
-    role = Column(String(20), nullable=False)  # Admin, Specialist, Patient, FamilyMember
+    role = Column(SAEnum(UserRole, name='user_role', values_callable=_enum_values), nullable=False)
     registration_date = Column(DateTime, default=func.now())
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
-    created_by = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=True)
-    updated_by = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=True)
     
     # Relationships
-    specialist = relationship("Specialist", back_populates="user", uselist=False)
-    patient = relationship("Patient", back_populates="user", uselist=False)
-    family_member = relationship("FamilyMember", back_populates="user", uselist=False)
-    
-    # Audit relationships
-    created_user = relationship("User", foreign_keys=[created_by], remote_side=[id])
-    updated_user = relationship("User", foreign_keys=[updated_by], remote_side=[id])
-    
-    # Notifications
-    notifications = relationship("Notification", back_populates="user")
-    
-    # Audit logs
-    audit_logs = relationship("AuditLog", back_populates="user")
-    
-    __table_args__ = (
-        CheckConstraint(
-            role.in_(['Admin', 'Specialist', 'Patient', 'FamilyMember']),
-            name='valid_user_role'
-        ),
+    specialist = relationship("Specialist", back_populates="user", uselist=False, foreign_keys="Specialist.user_id", lazy="joined")
+    patient = relationship("Patient", back_populates="user", uselist=False, foreign_keys="Patient.user_id", lazy="joined")
+    # One row per patient this user may access as a relative (user_id isn't unique)
+    family_members = relationship("FamilyMember", back_populates="user", foreign_keys="FamilyMember.user_id")
+    
+    # Notifications - the whole inbox, so never lazy loaded; use options(selectinload(User.notifications))
+    notifications = relationship("Notification", back_populates="user", lazy="raise")
+    
+    # Audit logs - unbounded, so never lazy loaded; use options(selectinload(User.audit_logs))
+    audit_logs = relationship(
+        "AuditLog", back_populates="user", lazy="raise",
+        primaryjoin="User.id == foreign(AuditLog.user_id)"
     )
 
-class Specialist(Base):
+class Specialist(AuditMixin, Base):
     """Specialist model - Medical professionals with specialties"""
     __tablename__ = 'specialists'
     
@@ -75,70 +156,54 @@ class Specialist(Base):
     phone_number = Column(String(20), nullable=True)
     professional_license = Column(String(100), nullable=True)
     bio = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
-    created_by = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=True)
-    updated_by = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=True)
     
     # Relationships
-    user = relationship("User", back_populates="specialist")
+    user = relationship("User", back_populates="specialist", foreign_keys=[user_id])
     appointments = relationship("Appointment", back_populates="specialist")
     availability_blocks = relationship("AvailabilityBlock", back_populates="specialist")
     medical_records = relationship("MedicalRecord", back_populates="specialist")
     templates = relationship("Template", back_populates="specialist")
     educational_materials = relationship("EducationalMaterial", back_populates="specialist")
-    
-    # Audit relationships
-    created_user = relationship("User", foreign_keys=[created_by])
-    updated_user = relationship("User", foreign_keys=[updated_by])
 
-class Patient(Base):
+class Patient(AuditMixin, Base):
     """Patient model - Patient profiles and medical information"""
     __tablename__ = 'patients'
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=generate_uuid)
     user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), unique=True, nullable=False)
-    date_of_birth = Column(DateTime, nullable=False)
+    date_of_birth = Column(Date, nullable=False)
     address = Column(Text, nullable=True)
     emergency_phone = Column(String(20), nullable=True)
     emergency_contact_name = Column(String(200), nullable=True)
     base_medical_history = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
-    created_by = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=True)
-    updated_by = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=True)
     
     # Relationships
-    user = relationship("User", back_populates="patient")
+    user = relationship("User", back_populates="patient", foreign_keys=[user_id])
     family_members = relationship("FamilyMember", back_populates="patient")
     appointments = relationship("Appointment", back_populates="patient")
     medical_records = relationship("MedicalRecord", back_populates="patient")
     material_assignments = relationship("PatientMaterialAssignment", back_populates="patient")
-    
-    # Audit relationships
-    created_user = relationship("User", foreign_keys=[created_by])
-    updated_user = relationship("User", foreign_keys=[updated_by])
+    latest_record = relationship(
+        "LatestMedicalRecord",
+        primaryjoin="Patient.id == foreign(LatestMedicalRecord.patient_id)",
+        viewonly=True,
+        uselist=False,
+    )
 
-class FamilyMember(Base):
+class FamilyMember(AuditMixin, Base):
     """Family Member model - Family relationships and access"""
     __tablename__ = 'family_members'
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=generate_uuid)
     user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     patient_id = Column(UUID(as_uuid=True), ForeignKey('patients.id', ondelete='CASCADE'), nullable=False)
-    relationship = Column(String(50), nullable=False)
-    created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
-    created_by = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=True)
-    updated_by = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=True)
     
     # Relationships
-    user = relationship("User", back_populates="family_member")
+    user = relationship("User", back_populates="family_members", foreign_keys=[user_id])
     patient = relationship("Patient", back_populates="family_members")
     
-    # Audit relationships
-    created_user = relationship("User", foreign_keys=[created_by])
-    updated_user = relationship("User", foreign_keys=[updated_by])
+    # Declared after the relationships above: this column shadows relationship() in the class body
+    relationship = Column(String(50), nullable=False)
     
     __table_args__ = (
         UniqueConstraint('user_id', 'patient_id', name='unique_user_patient'),
@@ -148,7 +213,7 @@ class FamilyMember(Base):
 # APPOINTMENT AND CALENDAR MANAGEMENT MODELS
 # =====================================================
 
-class Appointment(Base):
+class Appointment(AuditMixin, Base):
     """Appointment model - Scheduling and appointment tracking"""
     __tablename__ = 'appointments'
     
@@ -157,59 +222,47 @@ class Appointment(Base):
     patient_id = Column(UUID(as_uuid=True), ForeignKey('patients.id', ondelete='CASCADE'), nullable=False)
     start_datetime = Column(DateTime, nullable=False)
     end_datetime = Column(DateTime, nullable=False)
-    status = Column(String(20), default='Pending', nullable=False)
+    status = Column(
+        SAEnum(AppointmentStatus, name='appointment_status', values_callable=_enum_values),
+        default=AppointmentStatus.PENDING, nullable=False
+    )
     appointment_type = Column(String(50), nullable=False)
     internal_notes = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
-    created_by = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=True)
-    updated_by = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=True)
     
     # Relationships
     specialist = relationship("Specialist", back_populates="appointments")
     patient = relationship("Patient", back_populates="appointments")
     
-    # Audit relationships
-    created_user = relationship("User", foreign_keys=[created_by])
-    updated_user = relationship("User", foreign_keys=[updated_by])
-    
     __table_args__ = (
-        CheckConstraint(
-            status.in_(['Pending', 'Confirmed', 'Canceled', 'Completed', 'NoShow']),
-            name='valid_appointment_status'
-        ),
         CheckConstraint(
             end_datetime > start_datetime,
             name='valid_appointment_time'
         ),
+        # Specialist calendar: index-only scan over a date range
+        Index(
+            'ix_appt_specialist_time', 'specialist_id', 'start_datetime',
+            postgresql_include=['status', 'patient_id']
+        ),
     )
 
-class AvailabilityBlock(Base):
+class AvailabilityBlock(AuditMixin, Base):
     """Availability Block model - Specialist availability management"""
     __tablename__ = 'availability_blocks'
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=generate_uuid)
     specialist_id = Column(UUID(as_uuid=True), ForeignKey('specialists.id', ondelete='CASCADE'), nullable=False)
-    day_of_week = Column(Integer, nullable=False)  # 1=Monday, 7=Sunday
-    start_time = Column(DateTime, nullable=False)
-    end_time = Column(DateTime, nullable=False)
+    day_of_week = Column(SmallInteger, nullable=False)  # 1=Monday, 7=Sunday
+    start_time = Column(Time, nullable=False)
+    end_time = Column(Time, nullable=False)
     is_active = Column(Boolean, default=True)
-    exception_date = Column(DateTime, nullable=True)
-    created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
-    created_by = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=True)
-    updated_by = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=True)
+    exception_date = Column(Date, nullable=True)
     
     # Relationships
     specialist = relationship("Specialist", back_populates="availability_blocks")
     
-    # Audit relationships
-    created_user = relationship("User", foreign_keys=[created_by])
-    updated_user = relationship("User", foreign_keys=[updated_by])
-    
     __table_args__ = (
         CheckConstraint(
-            day_of_week >= 1 and day_of_week <= 7,
+            'day_of_week BETWEEN 1 AND 7',
             name='valid_day_of_week'
         ),
         CheckConstraint(
@@ -222,7 +275,7 @@ class AvailabilityBlock(Base):
 # MEDICAL RECORDS AND CONTENT MODELS
 # =====================================================
 
-class MedicalRecord(Base):
+class MedicalRecord(AuditMixin, Base):
     """Medical Record model - Patient medical history and treatments"""
     __tablename__ = 'medical_records'
     
@@ -233,21 +286,30 @@ class MedicalRecord(Base):
     diagnosis = Column(Text, nullable=True)
     treatment = Column(Text, nullable=True)
     progress_notes = Column(Text, nullable=True)
-    attached_files_json = Column(JSONB, nullable=True)
-    created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
-    created_by = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=True)
-    updated_by = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=True)
+    attached_files_json = Column(JSONB(none_as_null=True), nullable=True)
     
     # Relationships
     patient = relationship("Patient", back_populates="medical_records")
     specialist = relationship("Specialist", back_populates="medical_records")
     
-    # Audit relationships
-    created_user = relationship("User", foreign_keys=[created_by])
-    updated_user = relationship("User", foreign_keys=[updated_by])
+    __table_args__ = (
+        CheckConstraint(
+            "jsonb_typeof(attached_files_json) = 'array'",
+            name='mr_files_is_array'
+        ),
+        # Patient history: index-only scan ordered by record date
+        Index(
+            'ix_mr_patient_date', 'patient_id', 'record_date',
+            postgresql_include=['specialist_id']
+        ),
+        # Containment (@>) queries on attachments
+        Index(
+            'ix_mr_files_gin', 'attached_files_json', postgresql_using='gin',
+            postgresql_ops={'attached_files_json': 'jsonb_path_ops'}
+        ),
+    )
 
-class Template(Base):
+class Template(AuditMixin, Base):
     """Template model - Reusable medical document templates"""
     __tablename__ = 'templates'
     
@@ -257,19 +319,11 @@ class Template(Base):
     content = Column(Text, nullable=False)
     template_type = Column(String(50), nullable=False)
     is_global = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
-    created_by = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=True)
-    updated_by = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=True)
     
     # Relationships
     specialist = relationship("Specialist", back_populates="templates")
-    
-    # Audit relationships
-    created_user = relationship("User", foreign_keys=[created_by])
-    updated_user = relationship("User", foreign_keys=[updated_by])
 
-class EducationalMaterial(Base):
+class EducationalMaterial(AuditMixin, Base):
     """Educational Material model - Educational content management"""
     __tablename__ = 'educational_materials'
     
@@ -280,20 +334,12 @@ class EducationalMaterial(Base):
     material_type = Column(String(50), nullable=False)
     publish_date = Column(DateTime, default=func.now())
     specialist_id = Column(UUID(as_uuid=True), ForeignKey('specialists.id', ondelete='SET NULL'), nullable=True)
-    created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
-    created_by = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=True)
-    updated_by = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=True)
     
     # Relationships
     specialist = relationship("Specialist", back_populates="educational_materials")
     material_assignments = relationship("PatientMaterialAssignment", back_populates="material")
-    
-    # Audit relationships
-    created_user = relationship("User", foreign_keys=[created_by])
-    updated_user = relationship("User", foreign_keys=[updated_by])
 
-class PatientMaterialAssignment(Base):
+class PatientMaterialAssignment(AuditMixin, Base):
     """Patient Material Assignment model - Patient-specific content assignments"""
     __tablename__ = 'patient_material_assignments'
     
@@ -302,19 +348,11 @@ class PatientMaterialAssignment(Base):
     material_id = Column(UUID(as_uuid=True), ForeignKey('educational_materials.id', ondelete='CASCADE'), nullable=False)
     assignment_date = Column(DateTime, default=func.now(), nullable=False)
     specialist_comments = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
-    created_by = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=True)
-    updated_by = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=True)
     
     # Relationships
     patient = relationship("Patient", back_populates="material_assignments")
     material = relationship("EducationalMaterial", back_populates="material_assignments")
     
-    # Audit relationships
-    created_user = relationship("User", foreign_keys=[created_by])
-    updated_user = relationship("User", foreign_keys=[updated_by])
-    
     __table_args__ = (
         UniqueConstraint('patient_id', 'material_id', name='unique_patient_material'),
     )
@@ -333,126 +371,531 @@ class Notification(Base):
     message = Column(Text, nullable=False)
     notification_type = Column(String(50), nullable=False)
     is_read = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=func.now())
+    # NOT NULL: get_notifications_page() pages on (created_at, id)
+    created_at = Column(DateTime, nullable=False, default=func.now(), server_default=func.now())
     read_at = Column(DateTime, nullable=True)
     
     # Relationships
     user = relationship("User", back_populates="notifications")
+    
+    __table_args__ = (
+        # Unread inbox: partial index only covers unread rows
+        Index('ix_notif_user_unread', 'user_id', postgresql_where=text('is_read = false')),
+        # Inbox keyset pagination (get_notifications_page)
+        Index('ix_notif_user_created', 'user_id', 'created_at', 'id'),
+    )
 
 class AuditLog(Base):
-    """Audit Log model - Track changes to sensitive data"""
+    """Audit Log model - Track changes to sensitive data
+
+    Range-partitioned by month on ``timestamp`` (see create_audit_log_partition),
+    so the partition key is part of the primary key.
+    """
     __tablename__ = 'audit_logs'
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=generate_uuid)
     table_name = Column(String(100), nullable=False)
     record_id = Column(UUID(as_uuid=True), nullable=False)
-    action = Column(String(20), nullable=False)  # INSERT, UPDATE, DELETE
+    action = Column(SAEnum(AuditAction, name='audit_action', values_callable=_enum_values), nullable=False)
     old_values = Column(JSONB, nullable=True)
     new_values = Column(JSONB, nullable=True)
-    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=True)
-    timestamp = Column(DateTime, default=func.now())
+    # No foreign key: the log outlives the user (including the DELETE row the
+    # trigger writes when a user deletes their own account)
+    user_id = Column(UUID(as_uuid=True), nullable=True)
+    timestamp = Column(DateTime, primary_key=True, default=func.now())
     
     # Relationships
-    user = relationship("User", back_populates="audit_logs")
+    user = relationship("User", back_populates="audit_logs", primaryjoin="foreign(AuditLog.user_id) == User.id")
     
     __table_args__ = (
-        CheckConstraint(
-            action.in_(['INSERT', 'UPDATE', 'DELETE']),
-            name='valid_audit_action'
+        # Record history lookups (get_audit_trail)
+        Index('ix_audit_table_rec_time', 'table_name', 'record_id', 'timestamp'),
+        # Changes made by a user (User.audit_logs)
+        Index('ix_audit_user_id', 'user_id'),
+        # Containment (@>) queries on changed values
+        Index(
+            'ix_audit_old_values_gin', 'old_values', postgresql_using='gin',
+            postgresql_ops={'old_values': 'jsonb_path_ops'}
+        ),
+        Index(
+            'ix_audit_new_values_gin', 'new_values', postgresql_using='gin',
+            postgresql_ops={'new_values': 'jsonb_path_ops'}
         ),
+        # History of a user account by its previous email address
+        Index(
+            'ix_audit_user_email', old_values['email'].astext,
+            postgresql_where=table_name == 'users'
+        ),
+        {'postgresql_partition_by': 'RANGE (timestamp)'},
     )
 
 # =====================================================
-# ENUMS (Python Enums for type safety)
+# MATERIALIZED VIEWS (read-only, refreshed out of band)
 # =====================================================
 
-from enum import Enum
+# The views live on their own MetaData so Base.metadata.create_all() and
+# Alembic autogenerate (flask db migrate) never see them as tables to create
+view_metadata = MetaData()
 
-class UserRole(Enum):
-    ADMIN = "Admin"
-    SPECIALIST = "Specialist"
-    PATIENT = "Patient"
-    FAMILY_MEMBER = "FamilyMember"
+class UpcomingAppointment(Base):
+    """Upcoming Appointment view - Pending/confirmed appointments with specialist details"""
+    __table__ = Table(
+        'mv_upcoming_appointments', view_metadata,
+        Column('id', UUID(as_uuid=True), primary_key=True),
+        Column('specialist_id', UUID(as_uuid=True), nullable=False),
+        Column('patient_id', UUID(as_uuid=True), nullable=False),
+        Column('start_datetime', DateTime, nullable=False),
+        Column('end_datetime', DateTime, nullable=False),
+        Column(
+            'status',
+            SAEnum(AppointmentStatus, name='appointment_status', values_callable=_enum_values),
+            nullable=False
+        ),
+        Column('appointment_type', String(50), nullable=False),
+        Column('specialty', String(100), nullable=False),
+        Column('specialist_first_name', String(100), nullable=False),
+        Column('specialist_last_name', String(100), nullable=False),
+    )
 
-class AppointmentStatus(Enum):
-    PENDING = "Pending"
-    CONFIRMED = "Confirmed"
-    CANCELED = "Canceled"
-    COMPLETED = "Completed"
-    NO_SHOW = "NoShow"
+class LatestMedicalRecord(Base):
+    """Latest Medical Record view - Most recent medical record per patient"""
+    __table__ = Table(
+        'mv_latest_medical_record', view_metadata,
+        Column('patient_id', UUID(as_uuid=True), primary_key=True),
+        Column('id', UUID(as_uuid=True), nullable=False),
+        Column('specialist_id', UUID(as_uuid=True), nullable=False),
+        Column('record_date', DateTime, nullable=False),
+        Column('diagnosis', Text, nullable=True),
+    )
+
+# DDL for the views above; create_tables() runs it after the base tables exist.
+# Each view needs a unique index for REFRESH MATERIALIZED VIEW CONCURRENTLY.
+MATERIALIZED_VIEWS = {
+    'mv_upcoming_appointments': [
+        """
+        CREATE MATERIALIZED VIEW IF NOT EXISTS mv_upcoming_appointments AS
+        SELECT a.id, a.specialist_id, a.patient_id, a.start_datetime, a.end_datetime,
+               a.status, a.appointment_type, s.specialty,
+               u.first_name AS specialist_first_name, u.last_name AS specialist_last_name
+        FROM appointments a
+        JOIN specialists s ON a.specialist_id = s.id
+        JOIN users u ON s.user_id = u.id
+        WHERE a.status IN ('Pending', 'Confirmed')
+        WITH DATA
+        """,
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_mv_upcoming_appointments_id ON mv_upcoming_appointments (id)",
+        "CREATE INDEX IF NOT EXISTS ix_mv_upcoming_appointments_specialist_start "
+        "ON mv_upcoming_appointments (specialist_id, start_datetime)",
+    ],
+    'mv_latest_medical_record': [
+        """
+        CREATE MATERIALIZED VIEW IF NOT EXISTS mv_latest_medical_record AS
+        SELECT DISTINCT ON (patient_id) patient_id, id, specialist_id, record_date, diagnosis
+        FROM medical_records
+        ORDER BY patient_id, record_date DESC, id DESC
+        WITH DATA
+        """,
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_mv_latest_medical_record_patient_id "
+        "ON mv_latest_medical_record (patient_id)",
+    ],
+}
+
+# =====================================================
+# AUDIT TRIGGERS
+# =====================================================
+
+# Tables whose row changes are copied into audit_logs by the audit_trigger()
+# function, in-server, so application code never writes AuditLog rows itself
+AUDITED_TABLES = ['users', 'patients', 'family_members', 'appointments', 'medical_records']
+
+# SQL counterpart of generate_uuid(): a UUIDv7 built by overlaying the unix-ms
+# timestamp on a random v4 and switching the version nibble from 4 to 7, so
+# trigger-written audit rows keep appending to the right edge of the PK index
+UUID_V7_FUNCTION = """
+CREATE OR REPLACE FUNCTION uuid_generate_v7()
+RETURNS uuid AS $$
+BEGIN
+    RETURN encode(
+        set_bit(
+            set_bit(
+                overlay(
+                    uuid_send(gen_random_uuid())
+                    PLACING substring(int8send(floor(extract(epoch FROM clock_timestamp()) * 1000)::bigint) FROM 3)
+                    FROM 1 FOR 6
+                ),
+                52, 1
+            ),
+            53, 1
+        ),
+        'hex'
+    )::uuid;
+END;
+$$ LANGUAGE plpgsql VOLATILE
+"""
+
+# TG_ARGV[0] names the primary key column. The acting user comes from the
+# transaction-local app.user_id setting (see set_audit_user()).
+AUDIT_TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION audit_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO audit_logs (id, table_name, record_id, action, old_values, new_values, user_id, timestamp)
+    VALUES (
+        uuid_generate_v7(),
+        TG_TABLE_NAME,
+        (COALESCE(to_jsonb(NEW), to_jsonb(OLD)) ->> TG_ARGV[0])::uuid,
+        TG_OP::audit_action,
+        to_jsonb(OLD) - 'password_hash',
+        to_jsonb(NEW) - 'password_hash',
+        NULLIF(current_setting('app.user_id', true), '')::uuid,
+        now()
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+def set_audit_user(connection, user_id):
+    """Record the acting user for audit rows written in the current transaction"""
+    connection.execute(
+        text("SELECT set_config('app.user_id', :user_id, true)"),
+        {'user_id': str(user_id) if user_id is not None else ''},
+    )
+
+def set_async_commit(connection):
+    """Don't wait for the WAL flush when the current transaction commits
+
+    Only for replayable bulk loads (audit batches, seed data): a crash can lose
+    the last few hundred milliseconds of such commits, but never corrupts data.
+    Applies to everything in the transaction, so keep critical writes
+    (appointments, medical records) out of it.
+    """
+    connection.execute(text("SET LOCAL synchronous_commit = OFF"))
+
+# Rows per INSERT statement in record_audit_many()
+AUDIT_BATCH_SIZE = 1000
+
+def record_audit_many(connection, rows, async_commit=False):
+    """Bulk-insert audit_logs rows with Core, bypassing the ORM unit of work
+
+    For audit events the triggers don't see (imports, background jobs). ``rows``
+    is a list of dicts keyed by AuditLog column name; missing columns are NULL,
+    except id (generate_uuid()) and timestamp (the column's now() default).
+    With ``async_commit`` the transaction commits without waiting for the WAL
+    flush (see set_async_commit()), so run it in a transaction of its own:
+
+        with engine.begin() as connection:
+            record_audit_many(connection, rows, async_commit=True)
+    """
+    if async_commit:
+        set_async_commit(connection)
+    # executemany() takes its column list from the first row, so every row is
+    # filled out to the same keys. Rows without a timestamp go in a separate
+    # statement that leaves the column to its SQL default.
+    columns = [column.name for column in AuditLog.__table__.c if column.name != 'timestamp']
+    stamped_rows, unstamped_rows = [], []
+    for row in rows:
+        values = {name: row.get(name) for name in columns}
+        if values['id'] is None:
+            values['id'] = generate_uuid()
+        if row.get('timestamp') is not None:
+            values['timestamp'] = row['timestamp']
+            stamped_rows.append(values)
+        else:
+            unstamped_rows.append(values)
+    stmt = insert(AuditLog.__table__)
+    for batch in (stamped_rows, unstamped_rows):
+        for start in range(0, len(batch), AUDIT_BATCH_SIZE):
+            connection.execute(stmt, batch[start:start + AUDIT_BATCH_SIZE])
 
 # =====================================================
 # HELPER FUNCTIONS
 # =====================================================
 
+def make_engine(database_url, **kwargs):
+    """Create an engine for these models with batching, pooling and caching tuned
+
+    With psycopg2, executemany() INSERTs (session.add_all() flushes, bulk
+    insert(Model) calls) are sent as multi-row INSERT ... VALUES pages of up to
+    1000 rows, and UPDATE/DELETE batches go through execute_batch().
+
+    On PostgreSQL the connection pool is sized for per-request sessions, JIT is
+    disabled (its setup cost outweighs the sub-millisecond OLTP queries issued
+    here) and, with psycopg 3, statements are server-side prepared after three
+    executions. Any keyword argument overrides these defaults.
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() == 'postgresql':
+        # Sizing only applies to the default QueuePool; NullPool (tests,
+        # pgbouncer) and other pool classes reject these arguments
+        if 'poolclass' not in kwargs:
+            kwargs.setdefault('pool_size', 20)
+            kwargs.setdefault('max_overflow', 10)
+        kwargs.setdefault('pool_pre_ping', True)
+        kwargs.setdefault('pool_recycle', 1800)
+        connect_args = dict(kwargs.get('connect_args', {}))
+        connect_args.setdefault('options', '-c jit=off')
+        if url.get_driver_name() == 'psycopg':
+            connect_args.setdefault('prepare_threshold', 3)
+        kwargs['connect_args'] = connect_args
+    if url.get_driver_name() == 'psycopg2':
+        kwargs.setdefault('executemany_mode', 'values_plus_batch')
+    kwargs.setdefault('insertmanyvalues_page_size', 1000)
+    kwargs.setdefault('query_cache_size', 1200)
+    return create_engine(url, **kwargs)
+
+def create_audit_log_partition(connection, year, month):
+    """Create the audit_logs partition for the given month if it doesn't exist
+
+    Run ahead of each month from a scheduled job; expired months are removed
+    with DROP TABLE audit_logs_YYYY_MM instead of a bulk DELETE.
+
+    If the job ran late, that month's rows are already in audit_logs_default
+    and PostgreSQL refuses to create the partition over them. The default
+    partition is then detached, the new partition created, the month's rows
+    moved into it and the default reattached, all in the caller's transaction
+    (which holds an ACCESS EXCLUSIVE lock on audit_logs until it commits).
+    """
+    start = date(year, month, 1)
+    end = date(year + month // 12, month % 12 + 1, 1)
+    partition = f"audit_logs_{start:%Y_%m}"
+    if connection.execute(text(f"SELECT to_regclass('{partition}')")).scalar() is not None:
+        return
+    has_default = connection.execute(text("SELECT to_regclass('audit_logs_default')")).scalar() is not None
+    if has_default:
+        connection.execute(text("ALTER TABLE audit_logs DETACH PARTITION audit_logs_default"))
+    connection.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {partition} PARTITION OF audit_logs "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    ))
+    if has_default:
+        connection.execute(
+            text(
+                f"WITH moved AS (DELETE FROM audit_logs_default "
+                f"WHERE timestamp >= :start AND timestamp < :end RETURNING *) "
+                f"INSERT INTO {partition} SELECT * FROM moved"
+            ),
+            {'start': start, 'end': end},
+        )
+        connection.execute(text("ALTER TABLE audit_logs ATTACH PARTITION audit_logs_default DEFAULT"))
+
 def create_tables(engine):
-    """Create all tables in the database"""
+    """Create all tables and materialized views in the database"""
     Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        # Catch-all partition plus the current and next month
+        connection.execute(text("CREATE TABLE IF NOT EXISTS audit_logs_default PARTITION OF audit_logs DEFAULT"))
+        today = date.today()
+        create_audit_log_partition(connection, today.year, today.month)
+        next_month = date(today.year + today.month // 12, today.month % 12 + 1, 1)
+        create_audit_log_partition(connection, next_month.year, next_month.month)
+        connection.execute(text(UUID_V7_FUNCTION))
+        connection.execute(text(AUDIT_TRIGGER_FUNCTION))
+        for table_name in AUDITED_TABLES:
+            connection.execute(text(f"DROP TRIGGER IF EXISTS audit_{table_name} ON {table_name}"))
+            connection.execute(text(
+                f"CREATE TRIGGER audit_{table_name} AFTER INSERT OR UPDATE OR DELETE ON {table_name} "
+                f"FOR EACH ROW EXECUTE FUNCTION audit_trigger('id')"
+            ))
+        for statements in MATERIALIZED_VIEWS.values():
+            for statement in statements:
+                connection.execute(text(statement))
 
 def drop_tables(engine):
-    """Drop all tables from the database"""
+    """Drop all materialized views and tables from the database"""
+    with engine.begin() as connection:
+        for view_name in MATERIALIZED_VIEWS:
+            connection.execute(text(f"DROP MATERIALIZED VIEW IF EXISTS {view_name}"))
     Base.metadata.drop_all(engine)
+    with engine.begin() as connection:
+        connection.execute(text("DROP FUNCTION IF EXISTS audit_trigger()"))
+        connection.execute(text("DROP FUNCTION IF EXISTS uuid_generate_v7()"))
+
+def refresh_materialized_views(connection, concurrently=True):
+    """Refresh every materialized view; run from a scheduled job
+
+    CONCURRENTLY keeps the views readable during the refresh.
+    """
+    mode = "CONCURRENTLY " if concurrently else ""
+    for view_name in MATERIALIZED_VIEWS:
+        connection.execute(text(f"REFRESH MATERIALIZED VIEW {mode}{view_name}"))
 
 # =====================================================
-# SAMPLE DATA CREATION
+# QUERY HELPERS (hot per-request lookups)
 # =====================================================
+# lambda_stmt() caches the constructed and compiled statement keyed on the
+# lambda's code location; closure variables become bound parameters, so
+# repeated calls skip SQL construction and compilation.
 
-def create_sample_data(session):
-    """Create sample data for development/testing"""
-    from werkzeug.security import generate_password_hash
-    
-    # Create admin user
-    admin_user = User(
-        first_name="Admin",
-        last_name="User",
-        email="admin@medicalcenter.com",
-        password_hash=generate_password_hash("admin123"),
-        role="Admin"
+def get_user_by_email(session, email):
+    """Fetch a user by email address (authentication path)
+
+    Loads the users row only: the mapped profile joins and notifications
+    collection are deferred with lazyload('*') and load on first access. The
+    strategy sticks to the instance in the identity map, which is why this is
+    not raiseload('*'): later code in the same session can still use them.
+    """
+    stmt = lambda_stmt(lambda: select(User).where(User.email == email).options(lazyload('*')))
+    return session.scalars(stmt).first()
+
+def get_unread_notifications(session, user_id):
+    """Fetch a user's unread notifications, newest first"""
+    stmt = lambda_stmt(
+        lambda: select(Notification)
+        .where(Notification.user_id == user_id, Notification.is_read == false())
+        .order_by(Notification.created_at.desc())
     )
-    session.add(admin_user)
-    
-    # Create specialist user
-    specialist_user = User(
-        first_name="Dr. Sarah",
-        last_name="Johnson",
-        email="sarah.johnson@medicalcenter.com",
-        password_hash=generate_password_hash("specialist123"),
-        role="Specialist"
+    return session.scalars(stmt).all()
+
+def get_notifications_page(session, user_id, before=None, limit=50):
+    """Fetch one page of a user's notifications, newest first
+
+    Keyset pagination: pass the (created_at, id) of the last notification of
+    the previous page as ``before``. Unlike OFFSET, each page is a single index
+    range scan however deep the inbox is.
+    """
+    stmt = select(Notification).where(Notification.user_id == user_id)
+    if before is not None:
+        stmt = stmt.where(tuple_(Notification.created_at, Notification.id) < tuple_(*before))
+    stmt = stmt.order_by(Notification.created_at.desc(), Notification.id.desc()).limit(limit)
+    return session.scalars(stmt).all()
+
+def iter_unread_notifications(session, batch_size=500):
+    """Stream every unread notification (background workers) in batches of ``batch_size`` rows"""
+    stmt = (
+        select(Notification)
+        .where(Notification.is_read == false())
+        .execution_options(yield_per=batch_size)
     )
-    session.add(specialist_user)
-    
-    # Create patient user
-    patient_user = User(
-        first_name="John",
-        last_name="Doe",
-        email="john.doe@email.com",
-        password_hash=generate_password_hash("patient123"),
-        role="Patient"
+    yield from session.scalars(stmt)
+
+def get_audit_trail(session, table_name, record_id):
+    """Fetch the audit history of a single record, newest first"""
+    stmt = lambda_stmt(
+        lambda: select(AuditLog)
+        .where(AuditLog.table_name == table_name, AuditLog.record_id == record_id)
+        .order_by(AuditLog.timestamp.desc())
     )
-    session.add(patient_user)
+    return session.scalars(stmt).all()
+
+# =====================================================
+# DIAGNOSTICS (query-count assertions in tests)
+# =====================================================
+
+@contextmanager
+def count_queries(bind):
+    """Collect the SQL statements executed on ``bind`` (Engine or Connection) inside the block
+
+        with count_queries(engine) as queries:
+            get_user_by_email(session, email)
+        assert len(queries) == 1
+    """
+    queries = []
+    
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        queries.append(statement)
+    
+    event.listen(bind, 'before_cursor_execute', _record)
+    try:
+        yield queries
+    finally:
+        event.remove(bind, 'before_cursor_execute', _record)
+
+def enable_raiseload_guard(session):
+    """Make every relationship load in ``session`` raise unless the query asks for it
+
+    Applies raiseload('*') to each ORM SELECT, overriding the mapped lazy=
+    strategies; loaders a query names explicitly (selectinload(), joinedload())
+    still apply. Meant for test fixtures, so accidental N+1 loads fail in CI.
+    """
+    @event.listens_for(session, 'do_orm_execute')
+    def _apply_raiseload(orm_execute_state):
+        if (
+            orm_execute_state.is_select
+            and not orm_execute_state.is_column_load
+            and not orm_execute_state.is_relationship_load
+        ):
+            statement = orm_execute_state.statement
+            if isinstance(statement, StatementLambdaElement):
+                # .options() on a lambda statement would resolve to its cached
+                # expression, bound parameters from the first call included
+                statement = statement.add_criteria(lambda stmt: stmt.options(raiseload('*')))
+            else:
+                statement = statement.options(raiseload('*'))
+            orm_execute_state.statement = statement
+
+# =====================================================
+# SAMPLE DATA CREATION
+# =====================================================
+
+def create_sample_data(session):
+    """Create sample data for development/testing
+
+    Primary keys are generated up front so the profile rows can reference their
+    users without a RETURNING round-trip; each table is one multi-row INSERT and
+    everything is committed once.
+    """
+    from werkzeug.security import generate_password_hash
     
-    session.commit()
+    # Seed data can be recreated, so don't wait for the WAL flush on commit
+    set_async_commit(session)
+    
+    admin_user_id = generate_uuid()
+    specialist_user_id = generate_uuid()
+    patient_user_id = generate_uuid()
+    
+    # Create admin, specialist and patient users
+    session.execute(insert(User), [
+        {
+            "id": admin_user_id,
+            "first_name": "Admin",
+            "last_name": "User",
+            "email": "admin@medicalcenter.com",
+            "password_hash": generate_password_hash("admin123"),
+            "role": UserRole.ADMIN,
+        },
+        {
+            "id": specialist_user_id,
+            "first_name": "Dr. Sarah",
+            "last_name": "Johnson",
+            "email": "sarah.johnson@medicalcenter.com",
+            "password_hash": generate_password_hash("specialist123"),
+            "role": UserRole.SPECIALIST,
+        },
+        {
+            "id": patient_user_id,
+            "first_name": "John",
+            "last_name": "Doe",
+            "email": "john.doe@email.com",
+            "password_hash": generate_password_hash("patient123"),
+            "role": UserRole.PATIENT,
+        },
+    ])
     
     # Create specialist profile
-    specialist = Specialist(
-        user_id=specialist_user.id,
-        specialty="Acupuncture",
-        description="Licensed acupuncturist with 10+ years of experience",
-        phone_number="+1-555-0123",
-        professional_license="ACU-12345",
-        bio="Dr. Sarah Johnson is a certified acupuncturist specializing in pain management and stress relief."
-    )
-    session.add(specialist)
+    session.execute(insert(Specialist), [
+        {
+            "id": generate_uuid(),
+            "user_id": specialist_user_id,
+            "specialty": "Acupuncture",
+            "description": "Licensed acupuncturist with 10+ years of experience",
+            "phone_number": "+1-555-0123",
+            "professional_license": "ACU-12345",
+            "bio": "Dr. Sarah Johnson is a certified acupuncturist specializing in pain management and stress relief.",
+        },
+    ])
     
     # Create patient profile
-    patient = Patient(
-        user_id=patient_user.id,
-        date_of_birth=datetime(1985, 6, 15),
-        address="123 Main St, City, State 12345",
-        emergency_phone="+1-555-9999",
-        emergency_contact_name="Jane Doe",
-        base_medical_history="No known allergies. Previous treatments include physical therapy for back pain."
-    )
-    session.add(patient)
+    session.execute(insert(Patient), [
+        {
+            "id": generate_uuid(),
+            "user_id": patient_user_id,
+            "date_of_birth": date(1985, 6, 15),
+            "address": "123 Main St, City, State 12345",
+            "emergency_phone": "+1-555-9999",
+            "emergency_contact_name": "Jane Doe",
+            "base_medical_history": "No known allergies. Previous treatments include physical therapy for back pain.",
+        },
+    ])
     
-    session.commit() 
\ No newline at end of file
+    session.commit()
@@ -0,0 +1,44 @@
+"""
+Shared pytest fixtures for the SQLAlchemy models
+"""
+
+import os
+import sys
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from models.sqlalchemy_models import Base, enable_raiseload_guard
+
+# Let the PostgreSQL column types render on the in-memory SQLite test database
+compiles(UUID, 'sqlite')(lambda type_, compiler, **kw: 'CHAR(32)')
+compiles(JSONB, 'sqlite')(lambda type_, compiler, **kw: 'JSON')
+
+# Tables free of PostgreSQL-only DDL (jsonb_typeof() checks); audit_logs'
+# partitioning and index options are ignored by SQLite
+SQLITE_TABLES = ['users', 'specialists', 'patients', 'family_members', 'notifications', 'audit_logs']
+
+@pytest.fixture
+def engine():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine, tables=[Base.metadata.tables[name] for name in SQLITE_TABLES])
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def session(engine):
+    """Session whose relationship loads raise unless the query asks for them"""
+    with Session(engine) as session:
+        enable_raiseload_guard(session)
+        yield session
+
+@pytest.fixture
+def unguarded_session(engine):
+    """Session with the mapped loader strategies, for tests of lazy loading itself"""
+    with Session(engine) as session:
+        yield session